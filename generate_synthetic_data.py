@@ -5,13 +5,53 @@ Generates physics-informed training data for GCD, IES, and EIS predictions
 
 import numpy as np
 import pandas as pd
+import gc
 import json
+import os
+import multiprocessing
 from pathlib import Path
+from typing import Iterator
+
+try:
+    import numba
+    from numba import guvectorize, njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+try:
+    import numexpr as ne
+    HAS_NUMEXPR = True
+except ImportError:
+    HAS_NUMEXPR = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+try:
+    import zarr
+    if int(zarr.__version__.split('.')[0]) < 3:
+        zarr = None  # The store layout uses the zarr 3 Group.create_array API
+except ImportError:
+    zarr = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    try:
+        import ujson as json
+    except ImportError:
+        pass
 
 # Configuration
 NUM_SAMPLES = 5000
 RANDOM_SEED = 42
-np.random.seed(RANDOM_SEED)
+ZARR_CHUNK = 256  # samples per Zarr chunk
+CHUNK_SIZE = 2 * ZARR_CHUNK  # samples per generated chunk; whole Zarr chunks per write
 
 # Define parameter spaces
 # Common metals - can be extended with any metal
@@ -22,6 +62,15 @@ ASSEMBLIES = ['Two-Electrode', 'Three-Electrode']
 ELECTRODES = ['Nickel Foam', 'Glassy Carbon', 'Carbon Cloth', 'Stainless Steel']
 IS_MOF = [True, False]
 
+PARAMETER_SPACES = {
+    'metal': METALS,
+    'valency': VALENCIES,
+    'ligand': LIGANDS,
+    'assembly': ASSEMBLIES,
+    'electrode': ELECTRODES,
+    'is_mof': IS_MOF
+}
+
 # Physics-informed parameters - Extended metal database
 METAL_PROPERTIES = {
     'Cu': {'redox_factor': 1.2, 'conductivity': 1.15, 'plasmon_peak': 22, 'd_transition': 5},
@@ -41,20 +90,6 @@ METAL_PROPERTIES = {
     'W': {'redox_factor': 1.16, 'conductivity': 1.13, 'plasmon_peak': 22.5, 'd_transition': 5.5},
 }
 
-# Function to get metal properties (with default for unknown metals)
-def get_metal_properties(metal):
-    """Get metal properties, with defaults for unknown metals"""
-    if metal in METAL_PROPERTIES:
-        return METAL_PROPERTIES[metal]
-    else:
-        # Default properties based on periodic table position
-        return {
-            'redox_factor': 1.0,
-            'conductivity': 1.0,
-            'plasmon_peak': 20.0,
-            'd_transition': 6.0
-        }
-
 ELECTRODE_PROPERTIES = {
     'Nickel Foam': {'capacity_boost': 1.3, 'resistance': 0.8},
     'Glassy Carbon': {'capacity_boost': 1.0, 'resistance': 1.0},
@@ -71,204 +106,469 @@ LIGAND_PROPERTIES = {
     'TPA': {'porosity': 1.12, 'stability': 1.08},
 }
 
-def generate_gcd_curve(params):
-    """Generate Galvanostatic Charge-Discharge curve data"""
-    current_densities = np.array([0.5, 1.0, 1.5, 2.0, 2.5])
-    
-    # Base parameters
-    metal = params['metal']
-    valency = params['valency']
-    is_mof = params['is_mof']
-    electrode = params['electrode']
-    ligand = params['ligand']
-    assembly = params['assembly']
-    
-    # Calculate capacity multiplier
-    base_capacity = 100 * valency  # mAh/g
-    metal_props = get_metal_properties(metal)
-    metal_factor = metal_props['redox_factor']
-    electrode_factor = ELECTRODE_PROPERTIES[electrode]['capacity_boost']
-    ligand_factor = LIGAND_PROPERTIES[ligand]['porosity']
-    mof_factor = 1.5 if is_mof else 1.0
-    assembly_factor = 1.1 if assembly == 'Three-Electrode' else 1.0
+def _property_table(properties, names, field):
+    """Flatten one field of a {name: {field: value}} table into an array ordered like names"""
+    return np.array([properties[name][field] for name in names], dtype=np.float32)
+
+# Lookup tables indexed by the integer category ids drawn in sample_parameters()
+_VALENCY_VALUES = np.array(VALENCIES)
+_IS_MOF_VALUES = np.array(IS_MOF)
+_METAL_REDOX = _property_table(METAL_PROPERTIES, METALS, 'redox_factor')
+_METAL_PLASMON = _property_table(METAL_PROPERTIES, METALS, 'plasmon_peak')
+_METAL_D_TRANSITION = _property_table(METAL_PROPERTIES, METALS, 'd_transition')
+_ELECTRODE_BOOST = _property_table(ELECTRODE_PROPERTIES, ELECTRODES, 'capacity_boost')
+_ELECTRODE_RESISTANCE = _property_table(ELECTRODE_PROPERTIES, ELECTRODES, 'resistance')
+_LIGAND_POROSITY = _property_table(LIGAND_PROPERTIES, LIGANDS, 'porosity')
+_THREE_ELECTRODE = ASSEMBLIES.index('Three-Electrode')
+
+# Curves are synthesized with added noise, so float32 carries more than enough precision
+_BASE_CAPACITY = np.array([100 * v for v in VALENCIES], dtype=np.float32)  # mAh/g
+_MOF_FACTOR = np.array([1.5 if m else 1.0 for m in IS_MOF], dtype=np.float32)
+_ASSEMBLY_FACTOR = np.array([1.1 if a == 'Three-Electrode' else 1.0 for a in ASSEMBLIES], dtype=np.float32)
+
+# Sampling grids and grid-only terms, identical for every sample
+_GCD_CURRENTS = np.array([0.5, 1.0, 1.5, 2.0, 2.5], dtype=np.float32)  # A/g
+_GCD_TAU = np.linspace(0, 1, 200, dtype=np.float32)  # time / max discharge time
+_GCD_DECAY = np.exp(-3 * _GCD_TAU)
+_RATE_CURRENTS = np.linspace(0.5, 5.0, 10, dtype=np.float32)  # A/g
+_RATE_FALLOFF = (0.5 / _RATE_CURRENTS)**0.3
+_ENERGY = np.linspace(0, 50, 500, dtype=np.float32)  # eV
+_IES_BACKGROUND = 0.1 * np.exp(-_ENERGY / 30)
+_FREQ = np.logspace(-2, 5, 100, dtype=np.float32)  # Hz
+_OMEGA = 2 * np.pi * _FREQ
+_SQRT_OMEGA = np.sqrt(_OMEGA)
+
+if HAS_NUMBA:
+    # Shapes are fixed (currents x 200 time points), so compile eagerly for the
+    # float32 C-contiguous layout and cache the machine code between runs
+    @njit(
+        'void(f4[::1], f4[::1], f4[:, ::1], f4[:, ::1], f4[:, ::1], f4[:, :, ::1], f4[:, :, ::1], f4[:, :, ::1])',
+        parallel=True, fastmath=True, cache=True, boundscheck=False
+    )
+    def gcd_kernel(tau, decay, max_time, V_start, V_end, noise, time, voltage):
+        """Fill GCD time and voltage curves for every (sample, current density) pair"""
+        for i in prange(max_time.shape[0]):
+            for c in range(max_time.shape[1]):
+                span = V_start[i, c] - V_end[i, c]
+                for t in range(tau.shape[0]):
+                    time[i, c, t] = max_time[i, c] * tau[t]
+                    voltage[i, c, t] = V_end[i, c] + span * decay[t] + 0.01 * noise[i, c, t]
+    
+    @guvectorize(
+        ['void(f4[:], f4[:], f4, f4, f4, f4, f4, f4[:], f4[:])',
+         'void(f8[:], f8[:], f8, f8, f8, f8, f8, f8[:], f8[:])'],
+        '(n),(n),(),(),(),(),()->(n),(n)',
+        target='parallel', fastmath=True, cache=True
+    )
+    def eis_kernel(omega, sqrt_omega, R_sol, R_ct, CPE_T, CPE_P, W, Z_real, Z_imag):
+        """Randles-circuit impedance of one sample over the frequency grid; broadcasts over samples"""
+        # (j*omega)**p == omega**p * exp(j*p*pi/2), so the complex power reduces to a
+        # real power times one per-sample rotation; sqrt(omega) comes precomputed per grid point
+        phase = CPE_P * (np.pi / 2)
+        rot = np.cos(phase) + 1j * np.sin(phase)
+        for j in range(omega.shape[0]):
+            z_cpe = 1.0 / (CPE_T * omega[j]**CPE_P * rot)
+            z_w = W / sqrt_omega[j] * (1 - 1j)
+            z = R_sol + 1.0 / (1.0 / R_ct + 1.0 / (z_cpe + z_w))
+            Z_real[j] = z.real
+            Z_imag[j] = -z.imag  # Negative for conventional plotting
+
+def sample_parameters(rng, n):
+    """Draw n random parameter sets as integer indices into the parameter lists"""
+    return {key: rng.integers(len(choices), size=n) for key, choices in PARAMETER_SPACES.items()}
+
+def draw_noise(rng, n):
+    """Pre-draw all random numbers needed by the generators for a batch of n samples"""
+    return {
+        'gcd': {
+            'uniform': rng.random((2, n, 5), dtype=np.float32),
+            'normal': rng.standard_normal((n, 5, 200), dtype=np.float32)
+        },
+        'rate_capability': {
+            'normal': rng.standard_normal((n, 10), dtype=np.float32)
+        },
+        'ies': {
+            'uniform': rng.random((4, n, 1), dtype=np.float32),
+            'normal': rng.standard_normal((n, 500), dtype=np.float32)
+        },
+        'eis': {
+            'uniform': rng.random((5, n), dtype=np.float32),
+            'normal': rng.standard_normal((2, n, 100), dtype=np.float32)
+        }
+    }
+
+def generate_gcd_curve(params, noise):
+    """Generate Galvanostatic Charge-Discharge curve data for a batch of samples"""
+    current_densities = _GCD_CURRENTS
+    
+    # Calculate capacity multiplier, shape (N,)
+    base_capacity = _BASE_CAPACITY[params['valency']]  # mAh/g
+    metal_factor = _METAL_REDOX[params['metal']]
+    electrode_factor = _ELECTRODE_BOOST[params['electrode']]
+    ligand_factor = _LIGAND_POROSITY[params['ligand']]
+    mof_factor = _MOF_FACTOR[params['is_mof']]
+    assembly_factor = _ASSEMBLY_FACTOR[params['assembly']]
     
     capacity_multiplier = metal_factor * electrode_factor * ligand_factor * mof_factor * assembly_factor
     
-    # Generate discharge curves for each current density
-    gcd_data = {}
-    for i, current in enumerate(current_densities):
-        # Time points (0 to max discharge time)
-        max_time = (base_capacity * capacity_multiplier) / (current * 60)  # hours
-        time = np.linspace(0, max_time, 200)
-        
-        # Voltage decay (exponential with some noise)
-        V_start = 0.9 + 0.1 * np.random.random()
-        V_end = 0.1 + 0.05 * np.random.random()
-        voltage = V_end + (V_start - V_end) * np.exp(-time / (max_time / 3))
-        voltage += np.random.normal(0, 0.01, len(time))  # Add noise
-        
-        gcd_data[f'current_{current}'] = {
-            'time': time.tolist(),
-            'voltage': voltage.tolist()
-        }
+    # Discharge curves for all current densities at once, shape (N, currents, 200).
+    # Time runs from 0 to max discharge time, so the decay exp(-time / (max_time / 3))
+    # only depends on the normalized time tau and is shared by every curve.
+    max_time = (base_capacity * capacity_multiplier)[:, None] / (current_densities * 60)  # hours
+    
+    # Voltage decay (exponential with some noise)
+    V_start = 0.9 + 0.1 * noise['uniform'][0]
+    V_end = 0.1 + 0.05 * noise['uniform'][1]
+    decay = _GCD_DECAY
+    gcd_noise = noise['normal']
+    if HAS_NUMBA:
+        time = np.empty_like(gcd_noise)
+        voltage = np.empty_like(gcd_noise)
+        gcd_kernel(_GCD_TAU, decay, max_time, V_start, V_end, gcd_noise, time, voltage)
+    else:
+        time = max_time[:, :, None] * _GCD_TAU
+        V_start = V_start[:, :, None]
+        V_end = V_end[:, :, None]
+        if HAS_NUMEXPR:
+            voltage = np.empty_like(gcd_noise)
+            ne.evaluate('V_end + (V_start - V_end) * decay + 0.01 * gcd_noise', out=voltage, casting='same_kind')
+        else:
+            voltage = V_end + (V_start - V_end) * decay + 0.01 * gcd_noise
     
-    return gcd_data
+    return {
+        'current_densities': current_densities,
+        'time': time,
+        'voltage': voltage
+    }
 
-def generate_rate_capability(params):
-    """Generate Rate Capability data (specific capacity vs current density)"""
-    current_densities = np.linspace(0.5, 5.0, 10)
-    
-    # Base parameters
-    metal = params['metal']
-    valency = params['valency']
-    is_mof = params['is_mof']
-    electrode = params['electrode']
-    ligand = params['ligand']
+def generate_rate_capability(params, noise):
+    """Generate Rate Capability data (specific capacity vs current density) for a batch of samples"""
+    current_densities = _RATE_CURRENTS
     
-    # Calculate base capacity
-    base_capacity = 100 * valency
-    metal_factor = METAL_PROPERTIES[metal]['redox_factor']
-    electrode_factor = ELECTRODE_PROPERTIES[electrode]['capacity_boost']
-    ligand_factor = LIGAND_PROPERTIES[ligand]['porosity']
-    mof_factor = 1.5 if is_mof else 1.0
+    # Calculate base capacity, shape (N,)
+    base_capacity = _BASE_CAPACITY[params['valency']]
+    metal_factor = _METAL_REDOX[params['metal']]
+    electrode_factor = _ELECTRODE_BOOST[params['electrode']]
+    ligand_factor = _LIGAND_POROSITY[params['ligand']]
+    mof_factor = _MOF_FACTOR[params['is_mof']]
     
-    max_capacity = base_capacity * metal_factor * electrode_factor * ligand_factor * mof_factor
+    max_capacity = (base_capacity * metal_factor * electrode_factor * ligand_factor * mof_factor)[:, None]
     
-    # Capacity decay with increasing current (power law)
-    capacity = max_capacity * (0.5 / current_densities)**0.3
-    capacity += np.random.normal(0, max_capacity * 0.02, len(capacity))  # Add noise
-    capacity = np.clip(capacity, 0, max_capacity)
+    # Capacity decay with increasing current (power law), shape (N, 10)
+    capacity = max_capacity * _RATE_FALLOFF
+    capacity += noise['normal'] * (max_capacity * 0.02)  # Add noise
+    np.clip(capacity, 0, max_capacity, out=capacity)
     
     return {
-        'current_density': current_densities.tolist(),
-        'specific_capacity': capacity.tolist()
+        'current_density': current_densities,
+        'specific_capacity': capacity
     }
 
-def generate_ies_spectrum(params):
-    """Generate Inelastic Electron Scattering spectrum"""
-    energy = np.linspace(0, 50, 500)
-    
-    metal = params['metal']
-    metal_props = get_metal_properties(metal)
+def _gaussian_peak(x, center, width, height, out):
+    """Write height * exp(-((x - center) / width)**2) into out without temporaries"""
+    np.subtract(x, center, out=out)
+    out /= width
+    np.square(out, out=out)
+    np.negative(out, out=out)
+    np.exp(out, out=out)
+    out *= height
+    return out
+
+def generate_ies_spectrum(params, noise):
+    """Generate Inelastic Electron Scattering spectrum for a batch of samples"""
+    energy = _ENERGY
+    u = noise['uniform']
     
     # Bulk plasmon peak (Gaussian)
-    plasmon_energy = metal_props['plasmon_peak']
-    plasmon_intensity = 0.8 + 0.2 * np.random.random()
-    plasmon_width = 2.0 + 0.5 * np.random.random()
-    
-    plasmon_peak = plasmon_intensity * np.exp(-((energy - plasmon_energy) / plasmon_width)**2)
+    plasmon_energy = _METAL_PLASMON[params['metal']][:, None]
+    plasmon_intensity = 0.8 + 0.2 * u[0]
+    plasmon_width = 2.0 + 0.5 * u[1]
     
     # d-d transition peak (lower energy)
-    d_transition_energy = metal_props['d_transition']
-    d_intensity = 0.4 + 0.1 * np.random.random()
-    d_width = 1.5 + 0.3 * np.random.random()
-    
-    d_peak = d_intensity * np.exp(-((energy - d_transition_energy) / d_width)**2)
+    d_transition_energy = _METAL_D_TRANSITION[params['metal']][:, None]
+    d_intensity = 0.4 + 0.1 * u[2]
+    d_width = 1.5 + 0.3 * u[3]
     
     # Background (slowly decaying)
-    background = 0.1 * np.exp(-energy / 30)
-    
-    # Total spectrum
-    spectrum = plasmon_peak + d_peak + background
-    spectrum += np.random.normal(0, 0.01, len(energy))  # Add noise
-    spectrum = np.clip(spectrum, 0, None)
+    background = _IES_BACKGROUND
+    
+    # Total spectrum, accumulated in place in a float32 (N, 500) buffer
+    spectrum = np.empty((len(plasmon_energy), len(energy)), dtype=np.float32)
+    ies_noise = noise['normal']
+    if HAS_NUMEXPR:
+        ne.evaluate(
+            'plasmon_intensity * exp(-((energy - plasmon_energy) / plasmon_width)**2)'
+            ' + d_intensity * exp(-((energy - d_transition_energy) / d_width)**2)'
+            ' + background + 0.01 * ies_noise',
+            out=spectrum, casting='same_kind'
+        )
+    else:
+        d_peak = np.empty_like(spectrum)
+        _gaussian_peak(energy, plasmon_energy, plasmon_width, plasmon_intensity, out=spectrum)
+        spectrum += _gaussian_peak(energy, d_transition_energy, d_width, d_intensity, out=d_peak)
+        spectrum += background
+        spectrum += 0.01 * ies_noise  # Add noise
+    np.clip(spectrum, 0, None, out=spectrum)
     
     return {
-        'energy': energy.tolist(),
-        'intensity': spectrum.tolist()
+        'energy': energy,
+        'intensity': spectrum
     }
 
-def generate_eis_nyquist(params):
-    """Generate Electrochemical Impedance Spectroscopy Nyquist plot"""
+def generate_eis_nyquist(params, noise):
+    """Generate Electrochemical Impedance Spectroscopy Nyquist plot for a batch of samples"""
     # Frequency range (log scale)
-    freq = np.logspace(-2, 5, 100)
-    
-    metal = params['metal']
-    electrode = params['electrode']
-    
-    # Calculate resistance parameters
-    R_solution = 5 + 2 * np.random.random()  # Ohm
-    R_ct = ELECTRODE_PROPERTIES[electrode]['resistance'] * (20 + 10 * np.random.random())
-    CPE_T = 0.001 + 0.0005 * np.random.random()
-    CPE_P = 0.85 + 0.1 * np.random.random()
-    W = 10 + 5 * np.random.random()  # Warburg coefficient
+    freq = _FREQ
+    u = noise['uniform']
     
-    # Calculate complex impedance
-    omega = 2 * np.pi * freq
+    # Calculate resistance parameters, shape (N,)
+    R_solution = 5 + 2 * u[0]  # Ohm
+    R_ct = _ELECTRODE_RESISTANCE[params['electrode']] * (20 + 10 * u[1])
+    CPE_T = 0.001 + 0.0005 * u[2]
+    CPE_P = 0.85 + 0.1 * u[3]
+    W = 10 + 5 * u[4]  # Warburg coefficient
     
-    # CPE impedance
-    Z_CPE = 1 / (CPE_T * (1j * omega)**CPE_P)
+    # Calculate complex impedance, shape (N, 100)
+    omega = _OMEGA
     
-    # Warburg impedance (low frequency)
-    Z_W = W / np.sqrt(omega) * (1 - 1j)
-    
-    # Total impedance (simplified Randles circuit)
-    Z_total = R_solution + 1 / (1/R_ct + 1/(Z_CPE + Z_W))
-    
-    Z_real = np.real(Z_total)
-    Z_imag = -np.imag(Z_total)  # Negative for conventional plotting
+    if HAS_NUMBA:
+        Z_real, Z_imag = eis_kernel(omega, _SQRT_OMEGA, R_solution, R_ct, CPE_T, CPE_P, W)
+    else:
+        # CPE impedance (complex64, since all inputs are float32), using
+        # (j*omega)**p == omega**p * exp(j*p*pi/2) to avoid an (N, 100) complex power
+        phase = CPE_P * (np.pi / 2)
+        rot = np.cos(phase) + 1j * np.sin(phase)
+        Z_CPE = 1 / (CPE_T[:, None] * omega**CPE_P[:, None] * rot[:, None])
+        
+        # Warburg impedance (low frequency)
+        Z_W = W[:, None] / _SQRT_OMEGA * (1 - 1j)
+        
+        # Total impedance (simplified Randles circuit)
+        Z_total = R_solution[:, None] + 1 / (1/R_ct[:, None] + 1/(Z_CPE + Z_W))
+        
+        # Contiguous copies so NPZ/Zarr/NDJSON see the same layout as the Numba path
+        Z_real = np.ascontiguousarray(Z_total.real)
+        Z_imag = np.ascontiguousarray(-Z_total.imag)  # Negative for conventional plotting
     
     # Add noise
-    Z_real += np.random.normal(0, 0.5, len(Z_real))
-    Z_imag += np.random.normal(0, 0.5, len(Z_imag))
+    Z_real += 0.5 * noise['normal'][0]
+    Z_imag += 0.5 * noise['normal'][1]
+    
+    return {
+        'z_real': Z_real,
+        'z_imag': Z_imag,
+        'frequency': freq
+    }
+
+# Output fields that hold the shared x-axis grid rather than per-sample values
+_GRID_FIELDS = {'current_densities', 'current_density', 'energy', 'frequency'}
+
+def _generate_chunk(job):
+    """Generate the outputs for one chunk of parameters from its own seed sequence"""
+    params, seed = job
+    noise = draw_noise(np.random.default_rng(seed), len(params['metal']))
     
     return {
-        'z_real': Z_real.tolist(),
-        'z_imag': Z_imag.tolist(),
-        'frequency': freq.tolist()
+        'gcd': generate_gcd_curve(params, noise['gcd']),
+        'rate_capability': generate_rate_capability(params, noise['rate_capability']),
+        'ies': generate_ies_spectrum(params, noise['ies']),
+        'eis': generate_eis_nyquist(params, noise['eis'])
+    }
+
+def _concat_chunks(chunks):
+    """Join (params, outputs) chunks along the batch axis, keeping a single copy of each grid"""
+    params = {key: np.concatenate([p[key] for p, _ in chunks]) for key in chunks[0][0]}
+    outputs = {
+        name: {
+            field: first if field in _GRID_FIELDS else np.concatenate([o[name][field] for _, o in chunks])
+            for field, first in curves.items()
+        }
+        for name, curves in chunks[0][1].items()
     }
+    return params, outputs
 
-def generate_sample():
-    """Generate a single synthetic sample"""
-    # Random parameters
-    params = {
-        'metal': np.random.choice(METALS),
-        'valency': np.random.choice(VALENCIES),
-        'ligand': np.random.choice(LIGANDS),
-        'assembly': np.random.choice(ASSEMBLIES),
-        'electrode': np.random.choice(ELECTRODES),
-        'is_mof': np.random.choice(IS_MOF)
+def _init_worker():
+    """Limit a pool worker to one Numba/numexpr thread, so workers don't oversubscribe the cores"""
+    if HAS_NUMBA:
+        numba.set_num_threads(1)
+    if HAS_NUMEXPR:
+        ne.set_num_threads(1)
+
+def iter_chunks(n, seed, processes=1):
+    """Generate n synthetic samples in chunks, yielding (params, outputs) chunks in order"""
+    # Each chunk gets its own spawned seed sequence, so results depend only on
+    # the seed and not on how many processes share the work
+    params = sample_parameters(np.random.default_rng(seed), n)
+    starts = range(0, n, CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    jobs = [({key: idx[s:s + CHUNK_SIZE] for key, idx in params.items()}, seq) for s, seq in zip(starts, seeds)]
+    
+    # Chunks run inline by default: generation is already vectorized, and a
+    # spawned worker pays seconds of re-import and JIT start-up per process
+    if processes is None:
+        processes = min(os.cpu_count() or 1, len(jobs))
+    if processes > 1:
+        # Numba and numexpr start thread pools, which are not fork-safe
+        with multiprocessing.get_context('spawn').Pool(processes, initializer=_init_worker) as pool:
+            for (chunk_params, _), outputs in zip(jobs, pool.imap(_generate_chunk, jobs)):
+                yield chunk_params, outputs
+    else:
+        for job in jobs:
+            yield job[0], _generate_chunk(job)
+
+def generate_batch(n, seed, processes=1):
+    """Generate n synthetic samples, with a leading batch axis on every output"""
+    return _concat_chunks(list(iter_chunks(n, seed, processes)))
+
+def stream_samples(n, seed, processes=1) -> Iterator[dict]:
+    """Yield n synthetic samples one at a time as (inputs, outputs) records"""
+    for chunk_params, chunk_outputs in iter_chunks(n, seed, processes):
+        for i in range(len(chunk_params['metal'])):
+            yield sample_record(chunk_params, chunk_outputs, i)
+
+def sample_record(params, outputs, i):
+    """Extract sample i of a generated batch as a dict of plain inputs and NumPy outputs"""
+    gcd = outputs['gcd']
+    rate = outputs['rate_capability']
+    ies = outputs['ies']
+    eis = outputs['eis']
+    
+    inputs = {
+        'metal': METALS[params['metal'][i]],
+        'valency': VALENCIES[params['valency'][i]],
+        'ligand': LIGANDS[params['ligand'][i]],
+        'assembly': ASSEMBLIES[params['assembly'][i]],
+        'electrode': ELECTRODES[params['electrode'][i]],
+        'is_mof': IS_MOF[params['is_mof'][i]]
     }
     
-    # Generate all outputs
-    sample = {
-        'inputs': params,
+    return {
+        'inputs': inputs,
         'outputs': {
-            'gcd': generate_gcd_curve(params),
-            'rate_capability': generate_rate_capability(params),
-            'ies': generate_ies_spectrum(params),
-            'eis': generate_eis_nyquist(params)
+            'gcd': {
+                f'current_{current}': {
+                    'time': gcd['time'][i, j],
+                    'voltage': gcd['voltage'][i, j]
+                }
+                for j, current in enumerate(gcd['current_densities'])
+            },
+            'rate_capability': {
+                'current_density': rate['current_density'],
+                'specific_capacity': rate['specific_capacity'][i]
+            },
+            'ies': {
+                'energy': ies['energy'],
+                'intensity': ies['intensity'][i]
+            },
+            'eis': {
+                'z_real': eis['z_real'][i],
+                'z_imag': eis['z_imag'][i],
+                'frequency': eis['frequency']
+            }
         }
     }
-    
-    return sample
 
-def create_feature_vector(params):
-    """Convert categorical parameters to numerical features"""
-    features = []
-    
-    # One-hot encode metal
-    for metal in METALS:
-        features.append(1.0 if params['metal'] == metal else 0.0)
-    
-    # Valency (normalized)
-    features.append(params['valency'] / 3.0)
-    
-    # One-hot encode ligand
-    for ligand in LIGANDS:
-        features.append(1.0 if params['ligand'] == ligand else 0.0)
-    
-    # One-hot encode assembly
-    features.append(1.0 if params['assembly'] == 'Three-Electrode' else 0.0)
-    
-    # One-hot encode electrode
-    for electrode in ELECTRODES:
-        features.append(1.0 if params['electrode'] == electrode else 0.0)
-    
-    # Is MOF
-    features.append(1.0 if params['is_mof'] else 0.0)
-    
-    return features
+def inputs_frame(params):
+    """Build a DataFrame of sampled inputs with one categorical (integer-coded) column per parameter"""
+    return pd.DataFrame({
+        key: pd.Categorical.from_codes(params[key], categories=choices)
+        for key, choices in PARAMETER_SPACES.items()
+    })
+
+def save_curves(path, outputs):
+    """Save batched curve arrays to a compressed NPZ archive, one array per curve field"""
+    gcd = outputs['gcd']
+    rate = outputs['rate_capability']
+    ies = outputs['ies']
+    eis = outputs['eis']
+    
+    np.savez_compressed(
+        path,
+        gcd_current_density=gcd['current_densities'],
+        gcd_time=gcd['time'],
+        gcd_voltage=gcd['voltage'],
+        rate_current_density=rate['current_density'],
+        rate_specific_capacity=rate['specific_capacity'],
+        ies_energy=ies['energy'],
+        ies_intensity=ies['intensity'],
+        eis_zreal=eis['z_real'],
+        eis_zimag=eis['z_imag'],
+        eis_freq=eis['frequency']
+    )
+
+def create_zarr_store(path, n, params, outputs):
+    """Create a Zarr store for n samples, laid out after the first (params, outputs) chunk"""
+    root = zarr.open_group(str(path), mode='w')
+    
+    # Inputs as category codes, with the category names kept as attributes
+    inputs = root.create_group('inputs')
+    for key, choices in PARAMETER_SPACES.items():
+        arr = inputs.create_array(key, shape=(n,), chunks=(ZARR_CHUNK,), dtype=params[key].dtype)
+        arr.attrs['categories'] = [str(c) for c in choices]
+    
+    # One group per curve family; shared grids are stored once, per-sample
+    # curves with the batch axis chunked
+    for name, curves in outputs.items():
+        group = root.create_group(name)
+        for field, values in curves.items():
+            if field in _GRID_FIELDS:
+                group.create_array(field, data=values)
+            else:
+                group.create_array(
+                    field, shape=(n,) + values.shape[1:], chunks=(ZARR_CHUNK,) + values.shape[1:], dtype=values.dtype
+                )
+    return root
+
+def write_zarr_chunk(root, start, params, outputs):
+    """Write one (params, outputs) chunk into a Zarr store at batch offset start"""
+    stop = start + len(params['metal'])
+    for key in PARAMETER_SPACES:
+        root['inputs'][key][start:stop] = params[key]
+    for name, curves in outputs.items():
+        for field, values in curves.items():
+            if field not in _GRID_FIELDS:
+                root[name][field][start:stop] = values
+
+def _ndarray_to_list(obj):
+    """Fallback JSON encoder hook for NumPy arrays"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f'Object of type {obj.__class__.__name__} is not JSON serializable')
+
+def dumps_line(sample):
+    """Serialize one sample as a newline-terminated JSON record (bytes)"""
+    if orjson is not None:
+        return orjson.dumps(sample, default=_ndarray_to_list,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(sample, default=_ndarray_to_list) + '\n').encode()
+
+def create_feature_matrix(params):
+    """Convert categorical parameter indices to an (N, D) float32 feature matrix"""
+    return np.concatenate([
+        np.eye(len(METALS), dtype=np.float32)[params['metal']],                 # One-hot metal
+        (_VALENCY_VALUES[params['valency']].astype(np.float32) / 3)[:, None],   # Valency (normalized)
+        np.eye(len(LIGANDS), dtype=np.float32)[params['ligand']],               # One-hot ligand
+        (params['assembly'] == _THREE_ELECTRODE)[:, None].astype(np.float32),   # Three-electrode flag
+        np.eye(len(ELECTRODES), dtype=np.float32)[params['electrode']],         # One-hot electrode
+        _IS_MOF_VALUES[params['is_mof']][:, None].astype(np.float32)            # Is MOF
+    ], axis=1)
+
+def save_feature_summary(path, inputs_df, features):
+    """Save inputs and features as typed Parquet (numeric CSV without pyarrow); returns the file written"""
+    if pa is not None:
+        table = pa.Table.from_pandas(inputs_df, preserve_index=False)
+        table = table.append_column(
+            'features', pa.FixedSizeListArray.from_arrays(pa.array(features.ravel()), features.shape[1])
+        )
+        path = path.with_suffix('.parquet')
+        pq.write_table(table, path)
+    else:
+        # Category codes followed by one column per feature
+        codes = np.column_stack([inputs_df[key].cat.codes for key in inputs_df.columns])
+        header = ','.join(list(inputs_df.columns) + [f'feature_{j}' for j in range(features.shape[1])])
+        path = path.with_suffix('.csv')
+        np.savetxt(path, np.column_stack([codes, features]), fmt='%g', delimiter=',', header=header, comments='')
+    return path
 
 def main():
     """Generate synthetic dataset"""
@@ -279,46 +579,67 @@ def main():
     output_dir = Path('/home/claude/mof_data')
     output_dir.mkdir(exist_ok=True)
     
-    # Generate samples
-    dataset = []
-    feature_data = []
-    
-    for i in range(NUM_SAMPLES):
-        if (i + 1) % 500 == 0:
-            print(f"Generated {i + 1}/{NUM_SAMPLES} samples...")
-        
-        sample = generate_sample()
-        dataset.append(sample)
-        
-        # Create feature row for tabular export
-        features = create_feature_vector(sample['inputs'])
-        feature_row = sample['inputs'].copy()
-        feature_row['features'] = features
-        feature_data.append(feature_row)
-    
-    # Save complete dataset as JSON
-    output_file = output_dir / 'synthetic_dataset.json'
-    with open(output_file, 'w') as f:
-        json.dump(dataset, f, indent=2)
+    # Generate samples one vectorized chunk at a time, inline in this process, and
+    # write each chunk to NDJSON (one sample per line) before generating the next.
+    # Records are many short-lived objects, so keep the cyclic GC out of it.
+    # With zarr available, each chunk also goes into a chunked store so consumers
+    # can load a single curve family (e.g. root['ies/intensity']) on its own.
+    output_file = output_dir / 'synthetic_dataset.ndjson'
+    zarr_file = output_dir / 'mof_data.zarr'
+    store = None
+    chunks = []
+    written = 0
+    gc.disable()
+    try:
+        with open(output_file, 'wb') as f:
+            for chunk_params, chunk_outputs in iter_chunks(NUM_SAMPLES, RANDOM_SEED):
+                for i in range(len(chunk_params['metal'])):
+                    f.write(dumps_line(sample_record(chunk_params, chunk_outputs, i)))
+                f.flush()
+                if zarr is not None:
+                    if store is None:
+                        store = create_zarr_store(zarr_file, NUM_SAMPLES, chunk_params, chunk_outputs)
+                    write_zarr_chunk(store, written, chunk_params, chunk_outputs)
+                chunks.append((chunk_params, chunk_outputs))
+                written += len(chunk_params['metal'])
+                print(f"Written {written}/{NUM_SAMPLES} samples...")
+    finally:
+        gc.enable()
     print(f"\nSaved complete dataset to {output_file}")
+    if store is not None:
+        print(f"Saved chunked curve store to {zarr_file}")
+    
+    params, outputs = _concat_chunks(chunks)
+    features = create_feature_matrix(params)
+    inputs_df = inputs_frame(params)
+    
+    # Save curves as NumPy arrays and inputs as Parquet
+    curves_file = output_dir / 'curves.npz'
+    save_curves(curves_file, outputs)
+    print(f"Saved curve arrays to {curves_file}")
+    
+    if pa is not None:
+        inputs_file = output_dir / 'inputs.parquet'
+        inputs_df.to_parquet(inputs_file, index=False)
+    else:
+        inputs_file = output_dir / 'inputs.csv'
+        inputs_df.to_csv(inputs_file, index=False)
+    print(f"Saved inputs to {inputs_file}")
     
-    # Save feature summary as CSV
-    df = pd.DataFrame(feature_data)
-    csv_file = output_dir / 'feature_summary.csv'
-    df.to_csv(csv_file, index=False)
-    print(f"Saved feature summary to {csv_file}")
+    # Save feature summary
+    summary_file = save_feature_summary(output_dir / 'feature_summary', inputs_df, features)
+    print(f"Saved feature summary to {summary_file}")
     
     # Print statistics
     print("\n=== Dataset Statistics ===")
-    print(f"Total samples: {len(dataset)}")
-    print(f"Input dimension: {len(features)}")
+    print(f"Total samples: {len(inputs_df)}")
+    print(f"Input dimension: {features.shape[1]}")
     print("\nParameter distribution:")
-    for key in ['metal', 'valency', 'ligand', 'assembly', 'electrode', 'is_mof']:
-        values = [s['inputs'][key] for s in dataset]
-        unique, counts = np.unique(values, return_counts=True)
+    for key in inputs_df.columns:
+        counts = inputs_df[key].value_counts(sort=False)
         print(f"\n{key}:")
-        for val, count in zip(unique, counts):
-            print(f"  {val}: {count} ({100*count/len(dataset):.1f}%)")
+        for val, count in counts.items():
+            print(f"  {val}: {count} ({100*count/len(inputs_df):.1f}%)")
     
     print("\n✓ Data generation complete!")
 
@@ -1,12 +1,15 @@
+import zlib
 import streamlit as st
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import torch
-import torch.nn as nn
-import pickle
-from pathlib import Path
+from itertools import cycle
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
 
 # Page configuration
 st.set_page_config(
@@ -17,7 +20,7 @@ st.set_page_config(
 )
 
 # Custom CSS matching research paper style
-st.markdown("""
+_CUSTOM_CSS = """
 <style>
     .stApp {
         #background: linear-gradient(135deg, #f0f0f0 0%, #f0f0f0 100%);
@@ -29,7 +32,7 @@ st.markdown("""
         text-align: center;
         padding: 20px;
     }
-    .stButton>button {
+    .stButton>button, .stFormSubmitButton>button {
         background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
         color: white;
         font-weight: bold;
@@ -48,7 +51,49 @@ st.markdown("""
     .success{
     color: #ffffff;}
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Scholar reference banner, filled from a SCHOLAR_REFERENCES entry
+_SCHOLAR_BANNER = """
+            <div class='paper-reference' style='border-left: 4px solid #f093fb;'>
+                <span style='background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); padding: 5px 10px; border-radius: 5px; font-weight: bold; font-size: 0.85em;'>📚 SCHOLAR MATCH</span>
+                <h4 style='color: white; margin-top: 10px;'>{paper}</h4>
+                <p style='color: #e0e0e0; margin-bottom: 5px;'>
+                    <strong>Authors:</strong> {authors} | 
+                    <strong>Journal:</strong> {journal}
+                </p>
+                <div style='display: flex; gap: 20px; color: #a0aec0; font-size: 0.9em;'>
+                    <span>Ref Capacity: {gcd_capacity} mAh/g</span>
+                    <span>Ref Rct: {eis_resistance} Ω</span>
+                </div>
+            </div>
+            """
+
+# Welcome screen shown before the first generation
+_WELCOME_HTML = """
+        <div style='background: rgba(255, 255, 255, 0.1); border-radius: 10px; padding: 30px; margin: 20px 0;'>
+        <h3 style='color: white;'>📄 MOF-Accurate Graphs</h3>
+        <p style='color: #e0e0e0; font-size: 1.1em;'>
+        This tool generates graphs matching the exact format from the research MOF:
+        </p>
+        <ul style='color: #e0e0e0; font-size: 1.05em;'>
+            <li> GCD curves at 9 current densities (0.25-2.25 A/g)</li>
+            <li> EIS Nyquist plots (before/after 10000 cycles)</li>
+            <li><strong>Potential Window:</strong> 0-0.6V (hybrid device configuration)</li>
+            <li><strong>Professional Style:</strong> Publication-ready formatting</li>
+        </ul>
+        
+        <h4 style='color: white; margin-top: 30px;'>🎯 MOF Configuration:</h4>
+        <div style='background: rgba(102, 126, 234, 0.2); padding: 15px; border-radius: 8px; margin-top: 10px;'>
+            <p style='color: white; margin: 5px 0;'><b>Metal:</b> Cu</p>
+            <p style='color: white; margin: 5px 0;'><b>Ligand:</b> 4,4-bipyridine (Bpy)</p>
+            <p style='color: white; margin: 5px 0;'><b>Assembly:</b> Two-Electrode (Hybrid Device)</p>
+            <p style='color: white; margin: 5px 0;'><b>Electrode:</b> Nickel Foam</p>
+            <p style='color: white; margin: 5px 0;'><b>MOF Structure:</b> ✓ Enabled (2D Cu-MOF)</p>
+            <p style='color: #4facfe; margin: 10px 0;'>→ This matches the MOF exactly!</p>
+        </div>
+        </div>
+        """
 
 # Extended metal database matching MOF
 METAL_DATABASE = {
@@ -64,11 +109,12 @@ METAL_DATABASE = {
     'Pt': {'redox_factor': 1.22, 'conductivity': 1.17, 'color': '#e5e4e2'},
 }
 
+# Properties for metals outside the database
+_DEFAULT_METAL = {'redox_factor': 1.0, 'conductivity': 1.0, 'color': '#808080'}
+
 def get_metal_properties(metal):
-    """Get properties for any metal"""
-    if metal.upper() in METAL_DATABASE:
-        return METAL_DATABASE[metal.upper()]
-    return {'redox_factor': 1.0, 'conductivity': 1.0, 'color': '#808080'}
+    """Get properties for any metal (symbols in canonical case, e.g. 'Cu')"""
+    return METAL_DATABASE.get(metal, _DEFAULT_METAL)
 
 # Google Scholar reference data
 SCHOLAR_REFERENCES = {
@@ -124,20 +170,62 @@ SCHOLAR_REFERENCES = {
     }
 }
 
+_SCHOLAR_KEYS = frozenset(SCHOLAR_REFERENCES)
+
+# Ligand tokens used in reference keys; DOBDC must come before BDC, which it contains
+_LIGAND_TOKENS = ('DOBDC', 'BDC', 'BTC', 'TPA')
+
 def get_scholar_reference(metal, ligand):
     """Get Google Scholar reference if available"""
     # Clean ligand name to match keys
-    if 'BDC' in ligand: clean_ligand = 'BDC'
-    elif 'BTC' in ligand: clean_ligand = 'BTC'
-    elif 'DOBDC' in ligand: clean_ligand = 'DOBDC'
-    elif 'TPA' in ligand: clean_ligand = 'TPA'
-    else: clean_ligand = ligand
+    clean_ligand = next((token for token in _LIGAND_TOKENS if token in ligand), ligand)
     
     key = f"{metal}-{clean_ligand}"
-    return SCHOLAR_REFERENCES.get(key, None)
+    return SCHOLAR_REFERENCES[key] if key in _SCHOLAR_KEYS else None
 
-def MOF_style_simulation(params, voltage_range=(0.0, 0.6), time_range_max=500):
-    metal_props = get_metal_properties(params['metal'])
+# Per-function cap on cached results/figures; keys include free-form sidebar floats
+_CACHE_ENTRIES = 32
+
+# Input-independent sampling grids (float32 like the curves), shared read-only across calls
+_T_UNIT = np.linspace(0.0, 1.0, 100, dtype=np.float32)  # time / phase duration, per GCD phase
+_FREQ_GRID = np.logspace(-2, 5, 50, dtype=np.float32)  # Hz
+_OMEGA_GRID = np.float32(2 * np.pi) * _FREQ_GRID
+_INV_SQRT_OMEGA = np.float32(1.0) / np.sqrt(_OMEGA_GRID)
+# Every 4th GCD point plus both phase ends, for plotting only (exports keep all 200)
+_GCD_PLOT_INDEX = np.unique(np.r_[0:200:4, 99, 199])
+for _grid in (_T_UNIT, _FREQ_GRID, _OMEGA_GRID, _INV_SQRT_OMEGA, _GCD_PLOT_INDEX):
+    _grid.setflags(write=False)
+
+if HAS_NUMBA:
+    @njit(fastmath=True, cache=True)
+    def _eis_kernel(omega, inv_sqrt_omega, Rs, Rct_before, Rct_after, W):
+        """Fused loop over frequencies computing the before/after Nyquist curves"""
+        Z_real_before = np.empty_like(omega)
+        Z_imag_before = np.empty_like(omega)
+        Z_real_after = np.empty_like(omega)
+        Z_imag_after = np.empty_like(omega)
+        for i in range(omega.shape[0]):
+            warburg = W * inv_sqrt_omega[i]
+            wb = omega[i] * 0.01
+            wa = omega[i] * 0.015
+            denom_b = 1.0 / (1.0 + wb * wb)
+            denom_a = 1.0 / (1.0 + wa * wa)
+            Z_real_before[i] = Rs + Rct_before * denom_b + warburg
+            Z_imag_before[i] = Rct_before * wb * denom_b + warburg
+            Z_real_after[i] = Rs * 0.95 + Rct_after * denom_a + 0.8 * warburg
+            Z_imag_after[i] = Rct_after * wa * denom_a + 0.8 * warburg
+        return Z_real_before, Z_imag_before, Z_real_after, Z_imag_after
+
+@st.cache_data(show_spinner=False, max_entries=_CACHE_ENTRIES)
+def MOF_style_simulation(metal, valency, electrode, is_mof, voltage_range=(0.0, 0.6), time_range_max=500, seed=None):
+    """Simulate GCD and EIS data; cached on the (hashable) inputs"""
+    metal_props = get_metal_properties(metal)
+    
+    # Noise seeded from a stable digest of the inputs by default, so a cached result
+    # matches a fresh run, across restarts too
+    if seed is None:
+        seed = zlib.crc32(f"{metal}|{valency}|{electrode}".encode())
+    rng = np.random.default_rng(seed)
     
     electrode_boost = {
         'Nickel Foam': 1.3,
@@ -146,81 +234,84 @@ def MOF_style_simulation(params, voltage_range=(0.0, 0.6), time_range_max=500):
         'Stainless Steel': 1.1
     }
     
-    base_capacity = 100 * params['valency']
+    base_capacity = 100 * valency
     capacity_mult = (metal_props['redox_factor'] * 
-                    electrode_boost[params['electrode']] * 
-                    (1.5 if params['is_mof'] else 1.0))
+                    electrode_boost[electrode] * 
+                    (1.5 if is_mof else 1.0))
     
     # MOF-specific current densities ()
     current_densities = [0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 1.75, 2.0, 2.25]
     
-    # GCD curves (discharge only, matching MOF style)
-    gcd_data = {}
-    specific_capacities = []
-    specific_capacitances = []
+    # GCD curves (discharge only, matching MOF style), one row per current density
+    cd = np.asarray(current_densities, dtype=np.float32)
+    v_min, v_max = np.asarray(voltage_range, dtype=np.float32)
     
-    for current in current_densities:
-        # Calculate discharge time based on capacity
-        # Ensure total cycle (charge + discharge) fits within time_range_max
-        discharge_duration = min((base_capacity * capacity_mult) / (current * 60), time_range_max / 2)
-        
-        # Charge phase (0 to discharge_duration)
-        t_charge = np.linspace(0, discharge_duration, 100)
-        # Discharge phase (discharge_duration to 2*discharge_duration)
-        t_discharge = np.linspace(discharge_duration, 2 * discharge_duration, 100)
-        
-        time = np.concatenate([t_charge, t_discharge])
-        
-        v_min, v_max = voltage_range
-        
-        # Quasi-triangular shape
-        # Charge: Nonlinear rise (convex or concave depending on device, using nearly linear for "quasi")
-        charge_voltage = v_min + (v_max - v_min) * (t_charge / discharge_duration) ** 0.95
-        
-        # Discharge: Nonlinear decay
-        # For discharge, time starts from 0 relative to peak
-        rel_discharge_time = (t_discharge - discharge_duration) / discharge_duration
-        discharge_voltage = v_max - (v_max - v_min) * (rel_discharge_time ** 1.05)
-        
-        voltage = np.concatenate([charge_voltage, discharge_voltage])
-        voltage += np.random.normal(0, 0.002, len(time))  # Reduced noise
-        voltage = np.clip(voltage, v_min, v_max)
-        
-        gcd_data[current] = {'time': time, 'voltage': voltage}
-        
-        # Calculate specific capacity (C/g) - matching MOF Eq. 6
-        Q_s = current * discharge_duration * 3600 / 1000  # Convert to C/g
-        specific_capacities.append(Q_s)
-        
-        # Calculate specific capacitance (F/g) - matching MOF Eq. 7
-        C_s = Q_s / (v_max - v_min)
-        specific_capacitances.append(C_s)
+    # Calculate discharge time based on capacity, shape (9,)
+    # Ensure total cycle (charge + discharge) fits within time_range_max
+    discharge_duration = np.minimum((base_capacity * capacity_mult) / (cd * 60), time_range_max / 2)
+    duration = discharge_duration[:, None]
+    
+    # Charge phase (0 to discharge_duration), shape (9, 100)
+    t_charge = _T_UNIT * duration
+    # Discharge phase (discharge_duration to 2*discharge_duration), shape (9, 100)
+    t_discharge = t_charge + duration
+    
+    time = np.concatenate([t_charge, t_discharge], axis=1)
+    
+    # Quasi-triangular shape
+    # Charge: Nonlinear rise (convex or concave depending on device, using nearly linear for "quasi")
+    charge_voltage = v_min + (v_max - v_min) * (t_charge / duration) ** 0.95
+    
+    # Discharge: Nonlinear decay
+    # For discharge, time starts from 0 relative to peak
+    rel_discharge_time = (t_discharge - duration) / duration
+    discharge_voltage = v_max - (v_max - v_min) * (rel_discharge_time ** 1.05)
+    
+    voltage = np.concatenate([charge_voltage, discharge_voltage], axis=1)
+    voltage += rng.standard_normal(time.shape, dtype=np.float32) * np.float32(0.002)  # Reduced noise
+    voltage = np.clip(voltage, v_min, v_max)
+    
+    # Calculate specific capacity (C/g) - matching MOF Eq. 6
+    specific_capacities = cd * discharge_duration * 3600 / 1000  # Convert to C/g
+    
+    # Calculate specific capacitance (F/g) - matching MOF Eq. 7
+    specific_capacitances = specific_capacities / (v_max - v_min)
     
     # EIS Nyquist
     # Before stability: larger semicircle
-    freq_before = np.logspace(-2, 5, 50)
-    omega = 2 * np.pi * freq_before
+    omega = _OMEGA_GRID
     
     # Solution resistance Rs (MOF: ~1.88 Ω)
-    Rs = 1.5 + 0.5 * np.random.random()
+    Rs = np.float32(1.5 + 0.5 * rng.random())
     
     # Charge transfer resistance Rct (MOF: ~6.11 Ω before, ~2.42 Ω after)
-    Rct_before = 5.0 + 3.0 / metal_props['conductivity']
-    Rct_after = 2.0 + 1.0 / metal_props['conductivity']
+    Rct_before = np.float32(5.0 + 3.0 / metal_props['conductivity'])
+    Rct_after = np.float32(2.0 + 1.0 / metal_props['conductivity'])
     
     # Warburg impedance coefficient
-    W = 8.0
+    W = np.float32(8.0)
     
-    # Before stability - larger semicircle
-    Z_real_before = Rs + Rct_before / (1 + (omega * 0.01)**2) + W / np.sqrt(omega)
-    Z_imag_before = (Rct_before * omega * 0.01) / (1 + (omega * 0.01)**2) + W / np.sqrt(omega)
-    
-    # After stability - smaller semicircle (material stabilization)
-    Z_real_after = Rs * 0.95 + Rct_after / (1 + (omega * 0.015)**2) + W * 0.8 / np.sqrt(omega)
-    Z_imag_after = (Rct_after * omega * 0.015) / (1 + (omega * 0.015)**2) + W * 0.8 / np.sqrt(omega)
+    if HAS_NUMBA:
+        Z_real_before, Z_imag_before, Z_real_after, Z_imag_after = _eis_kernel(omega, _INV_SQRT_OMEGA, Rs, Rct_before, Rct_after, W)
+    else:
+        # Terms shared by both spectra
+        warburg = W * _INV_SQRT_OMEGA
+        wb = omega * 0.01
+        wa = omega * 0.015
+        denom_b = 1.0 / (1.0 + wb * wb)
+        denom_a = 1.0 / (1.0 + wa * wa)
+        
+        # Before stability - larger semicircle
+        Z_real_before = Rs + Rct_before * denom_b + warburg
+        Z_imag_before = Rct_before * wb * denom_b + warburg
+        
+        # After stability - smaller semicircle (material stabilization)
+        Z_real_after = Rs * 0.95 + Rct_after * denom_a + 0.8 * warburg
+        Z_imag_after = Rct_after * wa * denom_a + 0.8 * warburg
     
     return {
-        'gcd_data': gcd_data,
+        'gcd_time': time,
+        'gcd_voltage': voltage,
         'current_densities': current_densities,
         'specific_capacities': specific_capacities,
         'specific_capacitances': specific_capacitances,
@@ -232,7 +323,240 @@ def MOF_style_simulation(params, voltage_range=(0.0, 0.6), time_range_max=500):
         'Rct_after': Rct_after
     }
 
+@st.cache_data(show_spinner=False, max_entries=_CACHE_ENTRIES)
+def gcd_csv(results):
+    """Build the GCD export CSV, one row per (current density, time) point"""
+    time = results['gcd_time']
+    return pd.DataFrame({
+        'Current Density (A/g)': np.repeat(results['current_densities'], time.shape[1]),
+        'Time (s)': time.ravel(),
+        'Voltage (V)': results['gcd_voltage'].ravel()
+    }).to_csv(index=False)
+
+@st.cache_data(show_spinner=False, max_entries=_CACHE_ENTRIES)
+def eis_csv(results):
+    """Build the EIS export CSV, one row per frequency point"""
+    return pd.DataFrame({
+        "Z' Before (Ω)": results['eis_before']['z_real'],
+        "-Z'' Before (Ω)": results['eis_before']['z_imag'],
+        "Z' After (Ω)": results['eis_after']['z_real'],
+        "-Z'' After (Ω)": results['eis_after']['z_imag']
+    }).to_csv(index=False)
+
+def _figure_inputs(metal, valency, electrode, is_mof, ligand, compare_scholar, voltage_range=(0.0, 0.6),
+                   time_range_max=500.0):
+    """Look up the (cached) simulation results and scholar reference for a figure"""
+    results = MOF_style_simulation(
+        metal,
+        valency,
+        electrode,
+        is_mof,
+        voltage_range=voltage_range,
+        time_range_max=time_range_max
+    )
+    scholar_ref = get_scholar_reference(metal, ligand) if compare_scholar else None
+    return results, scholar_ref
+
+# GCD curve colors, matching the image (Red, Green, Purple, Blue, Brown, Cyan, Grey, Light Blue, Black)
+_PLOT_COLORS = ('#FF0000', '#008000', '#800080', '#0000FF', '#8B4513',
+                '#00FFFF', '#808080', '#ADD8E6', '#000000')
+
+# Axis styles: the GCD panel follows the paper figure (no grid, heavy frame,
+# inside ticks), the EIS panel a lighter gridded frame
+_GCD_AXIS_STYLE = dict(
+    showgrid=False,  # No grid as per image
+    showline=True,
+    linewidth=3,
+    linecolor='black',
+    mirror=True,
+    ticks='inside',
+    tickwidth=2,
+    ticklen=8,
+    tickfont=dict(size=14, color='black', family='Arial, sans-serif')
+)
+
+_EIS_AXIS_STYLE = dict(
+    showgrid=True,
+    gridwidth=1,
+    gridcolor='lightgray',
+    showline=True,
+    linewidth=2,
+    linecolor='black',
+    mirror=True,
+    ticks='outside',
+    tickfont=dict(color='black')
+)
+
+# Static figure layouts, validated once at import; figures fill in the
+# per-input title and axis ranges. These stay figure-level rather than a
+# registered Plotly template, because Streamlit merges its own chart theme
+# over the template layout and would override them.
+_GCD_LAYOUT = go.Layout(
+    title=dict(
+        x=0.01,
+        y=0.98,
+        xanchor='left',
+        yanchor='top'
+    ),
+    xaxis=dict(_GCD_AXIS_STYLE, title='<b>Time (sec)</b>'),
+    yaxis=dict(_GCD_AXIS_STYLE, title='<b>Potential (V)</b>'),
+    template='plotly_white',
+    plot_bgcolor='white',
+    paper_bgcolor='white',
+    height=500,
+    showlegend=True,
+    legend=dict(
+        x=0.98,
+        y=0.98,
+        xanchor='right',
+        yanchor='top',
+        bgcolor='white',
+        bordercolor='black',
+        borderwidth=2,
+        font=dict(size=12, color='black', family='Arial, sans-serif')
+    ),
+    font=dict(size=14, color='black', family='Arial, sans-serif'),
+    margin=dict(t=60, l=60, r=40, b=60)
+)
+
+_EIS_LAYOUT = go.Layout(
+    title=dict(
+        font=dict(size=16, color='white', family='Arial, sans-serif')
+    ),
+    xaxis=dict(_EIS_AXIS_STYLE, title="Z' Real (Ω)"),
+    yaxis=dict(_EIS_AXIS_STYLE, title="-Z'' Imaginary (Ω)"),
+    template='plotly_white',
+    plot_bgcolor='white',
+    paper_bgcolor='rgba(0,0,0,0)',
+    height=500,
+    showlegend=True,
+    legend=dict(
+        x=0.98,
+        y=0.98,
+        xanchor='right',
+        yanchor='top',
+        bgcolor='rgba(255,255,255,0.8)',
+        bordercolor='black',
+        borderwidth=1
+    ),
+    font=dict(size=12, color='white'),
+    hovermode='closest'
+)
+
+@st.cache_resource(show_spinner=False, max_entries=_CACHE_ENTRIES)
+def build_gcd_figure(metal, valency, electrode, is_mof, ligand, compare_scholar, voltage_min, voltage_max, time_max):
+    """Build the GCD figure; cached on the (primitive) inputs"""
+    results, scholar_ref = _figure_inputs(
+        metal, valency, electrode, is_mof, ligand, compare_scholar, (voltage_min, voltage_max), time_max
+    )
+    
+    traces = [
+        go.Scatter(
+            x=time,
+            y=voltage,
+            name=f'{current} A/g',
+            line=dict(color=color, width=4),  # Thicker lines
+            mode='lines'
+        )
+        for current, time, voltage, color in zip(
+            results['current_densities'],
+            results['gcd_time'][:, _GCD_PLOT_INDEX],
+            results['gcd_voltage'][:, _GCD_PLOT_INDEX],
+            cycle(_PLOT_COLORS)  # Cycle colors if more currents than colors
+        )
+    ]
+    
+    # Add literature comparison if available
+    if scholar_ref and compare_scholar:
+        # Simulate literature curve (approximation)
+        lit_time = np.linspace(0, time_max * 0.8, 100)
+        lit_voltage = voltage_max - (voltage_max - voltage_min) * (lit_time / (time_max * 0.8))
+        
+        traces.append(
+            go.Scatter(
+                x=lit_time,
+                y=lit_voltage,
+                name=f'Ref ({scholar_ref["authors"]})',
+                line=dict(color='#ff6b6b', width=4, dash='dash'),
+                mode='lines'
+            )
+        )
+    
+    fig_gcd = go.Figure(layout=_GCD_LAYOUT)
+    fig_gcd.add_traces(traces)
+    fig_gcd.update_layout(
+        title_text=f'<span style="color:red; font-weight:bold; font-size:24px">(A)</span>&nbsp;&nbsp;&nbsp;&nbsp;<span style="color:black; font-weight:bold; font-size:20px">GCD of {metal}-complex</span>',
+        yaxis_range=[voltage_min, voltage_max * 1.05]
+    )
+    
+    return fig_gcd
+
+@st.cache_resource(show_spinner=False, max_entries=_CACHE_ENTRIES)
+def build_eis_figure(metal, valency, electrode, is_mof, ligand, compare_scholar, z_min, z_max):
+    """Build the EIS Nyquist figure; cached on the (primitive) inputs"""
+    # The EIS curves don't depend on the GCD voltage window or time span, so the
+    # simulation runs with its defaults
+    results, scholar_ref = _figure_inputs(metal, valency, electrode, is_mof, ligand, compare_scholar)
+    
+    traces = [
+        # Before stability (larger semicircle)
+        go.Scatter(
+            x=results['eis_before']['z_real'],
+            y=results['eis_before']['z_imag'],
+            mode='markers+lines',
+            name='Before Stability',
+            marker=dict(size=8, color='#d62728', symbol='circle'),
+            line=dict(color='#d62728', width=2)
+        ),
+        # After stability (smaller semicircle)
+        go.Scatter(
+            x=results['eis_after']['z_real'],
+            y=results['eis_after']['z_imag'],
+            mode='markers+lines',
+            name='After 10000 Cycles',
+            marker=dict(size=8, color='#2ca02c', symbol='square'),
+            line=dict(color='#2ca02c', width=2)
+        )
+    ]
+    
+    # Add literature reference point if available
+    if scholar_ref and compare_scholar:
+        traces.append(
+            go.Scatter(
+                x=[scholar_ref['eis_resistance']],
+                y=[scholar_ref['eis_resistance'] * 0.5],
+                mode='markers',
+                name=f'Ref ({scholar_ref["authors"]})',
+                marker=dict(
+                    size=15,
+                    color='#ff6b6b',
+                    symbol='star',
+                    line=dict(width=2, color='white')
+                )
+            )
+        )
+    
+    z_range = [z_min, z_max] if z_max > z_min else None
+    
+    fig_eis = go.Figure(layout=_EIS_LAYOUT)
+    fig_eis.add_traces(traces)
+    fig_eis.update_layout(
+        title_text=f'(E) EIS Nyquist Plot: {metal}-{ligand}',
+        xaxis_range=z_range,
+        yaxis_range=z_range
+    )
+    
+    return fig_eis
+
+@st.cache_resource(show_spinner=False)
+def _init_page():
+    """Emit the custom CSS once; Streamlit replays the cached element on later reruns"""
+    st.markdown(_CUSTOM_CSS, unsafe_allow_html=True)
+    return True
+
 def main():
+    _init_page()
+    
     # Header
     st.markdown("<h1>⚡ MOF Performance Predictor</h1>", unsafe_allow_html=True)
     st.markdown("""
@@ -247,85 +571,88 @@ def main():
         
         use_custom_metal = st.checkbox("Use custom metal", value=False)
         
-        if use_custom_metal:
-            metal = st.text_input(
-                "Enter Metal Symbol",
-                value="Cu",
-                help="Enter any metal symbol"
-            ).upper()
-        else:
-            metal = st.selectbox(
-                "Metal Type",
-                options=list(METAL_DATABASE.keys()),
-                index=0,  # Default to Cu
-                help="Cu-MOF matches the MOF"
+        # Batch the remaining inputs so they only rerun the app on submit; the
+        # checkbox stays outside so toggling it swaps the metal input right away
+        with st.form("mof_params"):
+            if use_custom_metal:
+                metal = st.text_input(
+                    "Enter Metal Symbol",
+                    value="Cu",
+                    help="Enter any metal symbol"
+                ).strip().capitalize()
+            else:
+                metal = st.selectbox(
+                    "Metal Type",
+                    options=list(METAL_DATABASE.keys()),
+                    index=0,  # Default to Cu
+                    help="Cu-MOF matches the MOF"
+                )
+            
+            valency = st.slider("Valency", min_value=1, max_value=3, value=2)
+            
+            ligand = st.selectbox(
+                "Ligand",
+                options=['4,4-bipyridine (Bpy)', 'Isonicotinic acid (INA)', 'BDC', 'BTC', 'DOBDC', 'BPDC'],
+                index=0,
+                help="4,4-bipyridine matches the MOF"
             )
-        
-        valency = st.slider("Valency", min_value=1, max_value=3, value=2)
-        
-        ligand = st.selectbox(
-            "Ligand",
-            options=['4,4-bipyridine (Bpy)', 'Isonicotinic acid (INA)', 'BDC', 'BTC', 'DOBDC', 'BPDC'],
-            index=0,
-            help="4,4-bipyridine matches the MOF"
-        )
-        
-        assembly = st.radio(
-            "Assembly Type",
-            options=['Two-Electrode (Hybrid Device)', 'Three-Electrode'],
-            index=0,
-            help="Two-electrode matches (hybrid device)"
-        )
-        
-        electrode = st.selectbox(
-            "Electrode Substrate",
-            options=['Nickel Foam', 'Glassy Carbon', 'Carbon Cloth', 'Stainless Steel'],
-            index=0
-        )
-        
-        is_mof = st.checkbox(
-            "MOF Structure",
-            value=True,
-            help="Enable for 2D Cu-MOF (MOF configuration)"
-        )
-        
-        st.markdown("---")
-        st.markdown("### 📊 Graph Settings")
-        
-        col_v1, col_v2 = st.columns(2)
-        with col_v1:
-            voltage_min = st.number_input("GCD Voltage Min (V)", value=0.0, step=0.1)
-        with col_v2:
-            voltage_max = st.number_input(
-                "GCD Voltage Max (V)", 
-                value=0.6, 
-                step=0.1,
-                help="MOF uses 0-0.6V"
+            
+            assembly = st.radio(
+                "Assembly Type",
+                options=['Two-Electrode (Hybrid Device)', 'Three-Electrode'],
+                index=0,
+                help="Two-electrode matches (hybrid device)"
             )
             
-        col_z1, col_z2 = st.columns(2)
-        with col_z1:
-            z_min = st.number_input("EIS Axis Min (Ω)", value=0.0, step=5.0)
-        with col_z2:
-            z_max = st.number_input("EIS Axis Max (Ω)", value=50.0, step=5.0)
-        
-        time_max = st.number_input(
-            "Max Time (seconds)",
-            value=500.0,
-            step=50.0,
-            min_value=100.0,
-            help="Maximum discharge time"
-        )
-        
-        st.markdown("---")
-        compare_scholar = st.checkbox(
-            "📚 Compare with Google Scholar",
-            value=True,
-            help="Show comparison with published research"
-        )
-        
-        st.markdown("---")
-        predict_button = st.button("🔮 Generate MOF-Style Graphs", use_container_width=True)
+            electrode = st.selectbox(
+                "Electrode Substrate",
+                options=['Nickel Foam', 'Glassy Carbon', 'Carbon Cloth', 'Stainless Steel'],
+                index=0
+            )
+            
+            is_mof = st.checkbox(
+                "MOF Structure",
+                value=True,
+                help="Enable for 2D Cu-MOF (MOF configuration)"
+            )
+            
+            st.markdown("---")
+            st.markdown("### 📊 Graph Settings")
+            
+            col_v1, col_v2 = st.columns(2)
+            with col_v1:
+                voltage_min = st.number_input("GCD Voltage Min (V)", value=0.0, step=0.1)
+            with col_v2:
+                voltage_max = st.number_input(
+                    "GCD Voltage Max (V)", 
+                    value=0.6, 
+                    step=0.1,
+                    help="MOF uses 0-0.6V"
+                )
+                
+            col_z1, col_z2 = st.columns(2)
+            with col_z1:
+                z_min = st.number_input("EIS Axis Min (Ω)", value=0.0, step=5.0)
+            with col_z2:
+                z_max = st.number_input("EIS Axis Max (Ω)", value=50.0, step=5.0)
+            
+            time_max = st.number_input(
+                "Max Time (seconds)",
+                value=500.0,
+                step=50.0,
+                min_value=100.0,
+                help="Maximum discharge time"
+            )
+            
+            st.markdown("---")
+            compare_scholar = st.checkbox(
+                "📚 Compare with Google Scholar",
+                value=True,
+                help="Show comparison with published research"
+            )
+            
+            st.markdown("---")
+            predict_button = st.form_submit_button("🔮 Generate MOF-Style Graphs", use_container_width=True)
     
     # Main content
     if predict_button:
@@ -344,7 +671,10 @@ def main():
             scholar_ref = get_scholar_reference(metal, params['ligand']) if compare_scholar else None
             
             results = MOF_style_simulation(
-                params,
+                metal,
+                valency,
+                electrode,
+                is_mof,
                 voltage_range=(voltage_min, voltage_max),
                 time_range_max=time_max
             )
@@ -386,115 +716,16 @@ def main():
             
         # Display comparison banner if available
         if scholar_ref:
-            st.markdown(f"""
-            <div class='paper-reference' style='border-left: 4px solid #f093fb;'>
-                <span style='background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); padding: 5px 10px; border-radius: 5px; font-weight: bold; font-size: 0.85em;'>📚 SCHOLAR MATCH</span>
-                <h4 style='color: white; margin-top: 10px;'>{scholar_ref['paper']}</h4>
-                <p style='color: #e0e0e0; margin-bottom: 5px;'>
-                    <strong>Authors:</strong> {scholar_ref['authors']} | 
-                    <strong>Journal:</strong> {scholar_ref['journal']}
-                </p>
-                <div style='display: flex; gap: 20px; color: #a0aec0; font-size: 0.9em;'>
-                    <span>Ref Capacity: {scholar_ref['gcd_capacity']} mAh/g</span>
-                    <span>Ref Rct: {scholar_ref['eis_resistance']} Ω</span>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_SCHOLAR_BANNER.format(**scholar_ref), unsafe_allow_html=True)
         
         # Create MOF-style graphs
         
         col_gcd, col_eis = st.columns(2)
         
         with col_gcd:
-            fig_gcd = go.Figure()
-            
-            # Match colors from the image (Red, Green, Purple, Blue, Brown, Cyan, Grey, Light Blue)
-            colors = ['#FF0000', '#008000', '#800080', '#0000FF', '#8B4513', 
-                     '#00FFFF', '#808080', '#ADD8E6', '#000000']
-            
-            for i, current in enumerate(results['current_densities']):
-                gcd_curve = results['gcd_data'][current]
-                # Cycle colors if more currents than colors
-                color = colors[i % len(colors)]
-                
-                fig_gcd.add_trace(
-                    go.Scatter(
-                        x=gcd_curve['time'],
-                        y=gcd_curve['voltage'],
-                        name=f'{current} A/g',
-                        line=dict(color=color, width=4),  # Thicker lines
-                        mode='lines'
-                    )
-                )
-            
-            # Add literature comparison if available
-            if scholar_ref and compare_scholar:
-                # Simulate literature curve (approximation)
-                lit_time = np.linspace(0, time_max * 0.8, 100)
-                lit_voltage = voltage_max - (voltage_max - voltage_min) * (lit_time / (time_max * 0.8))
-                
-                fig_gcd.add_trace(
-                    go.Scatter(
-                        x=lit_time,
-                        y=lit_voltage,
-                        name=f'Ref ({scholar_ref["authors"]})',
-                        line=dict(color='#ff6b6b', width=4, dash='dash'),
-                        mode='lines'
-                    )
-                )
-            
-            fig_gcd.update_layout(
-                title=dict(
-                    text=f'<span style="color:red; font-weight:bold; font-size:24px">(A)</span>&nbsp;&nbsp;&nbsp;&nbsp;<span style="color:black; font-weight:bold; font-size:20px">GCD of {metal}-complex</span>',
-                    x=0.01,
-                    y=0.98,
-                    xanchor='left',
-                    yanchor='top'
-                ),
-                xaxis_title='<b>Time (sec)</b>',
-                yaxis_title='<b>Potential (V)</b>',
-                template='plotly_white',
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                height=500,
-                showlegend=True,
-                legend=dict(
-                    x=0.98,
-                    y=0.98,
-                    xanchor='right',
-                    yanchor='top',
-                    bgcolor='white',
-                    bordercolor='black',
-                    borderwidth=2,
-                    font=dict(size=12, color='black', family='Arial, sans-serif')
-                ),
-                font=dict(size=14, color='black', family='Arial, sans-serif'),
-                margin=dict(t=60, l=60, r=40, b=60)
-            )
-            
-            fig_gcd.update_xaxes(
-                showgrid=False,  # No grid as per image
-                showline=True,
-                linewidth=3,
-                linecolor='black',
-                mirror=True,
-                ticks='inside',
-                tickwidth=2,
-                ticklen=8,
-                tickfont=dict(size=14, color='black', family='Arial, sans-serif')
-            )
-            
-            fig_gcd.update_yaxes(
-                showgrid=False,  # No grid as per image
-                showline=True,
-                linewidth=3,
-                linecolor='black',
-                mirror=True,
-                ticks='inside',
-                tickwidth=2,
-                ticklen=8,
-                tickfont=dict(size=14, color='black', family='Arial, sans-serif'),
-                range=[voltage_min, voltage_max * 1.05]
+            fig_gcd = build_gcd_figure(
+                metal, valency, electrode, is_mof, params['ligand'], compare_scholar,
+                voltage_min, voltage_max, time_max
             )
             
             st.plotly_chart(fig_gcd, use_container_width=True)
@@ -509,98 +740,8 @@ def main():
             """, unsafe_allow_html=True)
         
         with col_eis:
-            fig_eis = go.Figure()
-            
-            # Before stability (larger semicircle)
-            fig_eis.add_trace(
-                go.Scatter(
-                    x=results['eis_before']['z_real'],
-                    y=results['eis_before']['z_imag'],
-                    mode='markers+lines',
-                    name='Before Stability',
-                    marker=dict(size=8, color='#d62728', symbol='circle'),
-                    line=dict(color='#d62728', width=2)
-                )
-            )
-            
-            # After stability (smaller semicircle)
-            fig_eis.add_trace(
-                go.Scatter(
-                    x=results['eis_after']['z_real'],
-                    y=results['eis_after']['z_imag'],
-                    mode='markers+lines',
-                    name='After 10000 Cycles',
-                    marker=dict(size=8, color='#2ca02c', symbol='square'),
-                    line=dict(color='#2ca02c', width=2)
-                )
-            )
-
-            # Add literature reference point if available
-            if scholar_ref and compare_scholar:
-                fig_eis.add_trace(
-                    go.Scatter(
-                        x=[scholar_ref['eis_resistance']],
-                        y=[scholar_ref['eis_resistance'] * 0.5],
-                        mode='markers',
-                        name=f'Ref ({scholar_ref["authors"]})',
-                        marker=dict(
-                            size=15,
-                            color='#ff6b6b',
-                            symbol='star',
-                            line=dict(width=2, color='white')
-                        )
-                    )
-                )
-            
-            fig_eis.update_layout(
-                title=dict(
-                    text=f'(E) EIS Nyquist Plot: {metal}-{params["ligand"]}',
-                    font=dict(size=16, color='white', family='Arial, sans-serif')
-                ),
-                xaxis_title="Z' Real (Ω)",
-                yaxis_title="-Z'' Imaginary (Ω)",
-                template='plotly_white',
-                plot_bgcolor='white',
-                paper_bgcolor='rgba(0,0,0,0)',
-                height=500,
-                showlegend=True,
-                legend=dict(
-                    x=0.98,
-                    y=0.98,
-                    xanchor='right',
-                    yanchor='top',
-                    bgcolor='rgba(255,255,255,0.8)',
-                    bordercolor='black',
-                    borderwidth=1
-                ),
-                font=dict(size=12, color='white'),
-                hovermode='closest'
-            )
-            
-            fig_eis.update_xaxes(
-                range=[z_min, z_max] if z_max > z_min else None,
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='lightgray',
-                showline=True,
-                linewidth=2,
-                linecolor='black',
-                mirror=True,
-                ticks='outside',
-                tickfont=dict(color='black')
-            )
-            
-            fig_eis.update_yaxes(
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='lightgray',
-                showline=True,
-                linewidth=2,
-                linecolor='black',
-                mirror=True,
-                ticks='outside',
-                tickfont=dict(color='black'),
-                range=[z_min, z_max] if z_max > z_min else None,
+            fig_eis = build_eis_figure(
+                metal, valency, electrode, is_mof, params['ligand'], compare_scholar, z_min, z_max
             )
             
             st.plotly_chart(fig_eis, use_container_width=True)
@@ -621,8 +762,8 @@ def main():
         
         metrics_data = {
             'Current Density (A/g)': results['current_densities'],
-            'Specific Capacity (C/g)': [f"{q:.2f}" for q in results['specific_capacities']],
-            'Specific Capacitance (F/g)': [f"{c:.2f}" for c in results['specific_capacitances']]
+            'Specific Capacity (C/g)': np.char.mod('%.2f', results['specific_capacities']),
+            'Specific Capacitance (F/g)': np.char.mod('%.2f', results['specific_capacitances'])
         }
         
         metrics_df = pd.DataFrame(metrics_data)
@@ -636,18 +777,7 @@ def main():
         
         with col1:
             # GCD CSV
-            gcd_export = []
-            for current in results['current_densities']:
-                for t, v in zip(results['gcd_data'][current]['time'], 
-                               results['gcd_data'][current]['voltage']):
-                    gcd_export.append({
-                        'Current Density (A/g)': current,
-                        'Time (s)': t,
-                        'Voltage (V)': v
-                    })
-            
-            df_gcd = pd.DataFrame(gcd_export)
-            csv_gcd = df_gcd.to_csv(index=False)
+            csv_gcd = gcd_csv(results)
             
             st.download_button(
                 label="📥 Download GCD Data (CSV)",
@@ -658,17 +788,7 @@ def main():
         
         with col2:
             # EIS CSV
-            eis_export = []
-            for i in range(len(results['eis_before']['z_real'])):
-                eis_export.append({
-                    "Z' Before (Ω)": results['eis_before']['z_real'][i],
-                    "-Z'' Before (Ω)": results['eis_before']['z_imag'][i],
-                    "Z' After (Ω)": results['eis_after']['z_real'][i],
-                    "-Z'' After (Ω)": results['eis_after']['z_imag'][i]
-                })
-            
-            df_eis = pd.DataFrame(eis_export)
-            csv_eis = df_eis.to_csv(index=False)
+            csv_eis = eis_csv(results)
             
             st.download_button(
                 label="📥 Download EIS Data (CSV)",
@@ -679,30 +799,7 @@ def main():
     
     else:
         # Welcome screen
-        st.markdown("""
-        <div style='background: rgba(255, 255, 255, 0.1); border-radius: 10px; padding: 30px; margin: 20px 0;'>
-        <h3 style='color: white;'>📄 MOF-Accurate Graphs</h3>
-        <p style='color: #e0e0e0; font-size: 1.1em;'>
-        This tool generates graphs matching the exact format from the research MOF:
-        </p>
-        <ul style='color: #e0e0e0; font-size: 1.05em;'>
-            <li> GCD curves at 9 current densities (0.25-2.25 A/g)</li>
-            <li> EIS Nyquist plots (before/after 10000 cycles)</li>
-            <li><strong>Potential Window:</strong> 0-0.6V (hybrid device configuration)</li>
-            <li><strong>Professional Style:</strong> Publication-ready formatting</li>
-        </ul>
-        
-        <h4 style='color: white; margin-top: 30px;'>🎯 MOF Configuration:</h4>
-        <div style='background: rgba(102, 126, 234, 0.2); padding: 15px; border-radius: 8px; margin-top: 10px;'>
-            <p style='color: white; margin: 5px 0;'><b>Metal:</b> Cu</p>
-            <p style='color: white; margin: 5px 0;'><b>Ligand:</b> 4,4-bipyridine (Bpy)</p>
-            <p style='color: white; margin: 5px 0;'><b>Assembly:</b> Two-Electrode (Hybrid Device)</p>
-            <p style='color: white; margin: 5px 0;'><b>Electrode:</b> Nickel Foam</p>
-            <p style='color: white; margin: 5px 0;'><b>MOF Structure:</b> ✓ Enabled (2D Cu-MOF)</p>
-            <p style='color: #4facfe; margin: 10px 0;'>→ This matches the MOF exactly!</p>
-        </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_WELCOME_HTML, unsafe_allow_html=True)
 
 if __name__ == "__main__":
     main()